@@ -17,11 +17,10 @@ FASTA files. For more Information see http://www.seqXML.org and Schmitt et al
 import sys
 
 from xml.sax.saxutils import XMLGenerator
+from xml.sax.saxutils import escape
+from xml.sax.saxutils import quoteattr
 from xml.sax.xmlreader import AttributesImpl
-from xml.dom import pulldom
-from xml.sax import SAXParseException
 
-from Bio._py3k import range
 from Bio._py3k import basestring
 from Bio._py3k import raise_from
 
@@ -32,18 +31,47 @@ from Bio.Seq import UnknownSeq
 from Bio.SeqRecord import SeqRecord
 from .Interfaces import SequentialSequenceWriter
 
+# For speed try to use cElementTree rather than ElementTree
+try:
+    from xml.etree import cElementTree as ElementTree
+except ImportError:
+    from xml.etree import ElementTree as ElementTree
+
+# If available, lxml can filter the parse events down to the entry elements
+# at the C level, which is faster still.
+try:
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_etree = None
+
+# The SeqXML sequence element for each type of base alphabet, in the order
+# the alphabets are checked
+_ALPHABET_SEQ_ELEMENTS = (
+    (Alphabet.RNAAlphabet, "RNAseq"),
+    (Alphabet.DNAAlphabet, "DNAseq"),
+    (Alphabet.ProteinAlphabet, "AAseq"),
+)
+# Cache of the sequence element for each alphabet class seen by the writer
+_seq_elements = {}
+# Annotation values of these types (or lists of them) are written as properties
+_PROPERTY_TYPES = (int, float, basestring)
+
 
 class SeqXmlIterator(object):
     """Breaks seqXML file into SeqRecords.
 
     Assumes valid seqXML please validate beforehand.
     It is assumed that all information for one record can be found within a
-    record element or above. Two types of methods are called when the start
-    tag of an element is reached. To receive only the attributes of an
-    element before its end tag is reached implement _attr_TAGNAME.
-    To get an element and its children as a DOM tree implement _elem_TAGNAME.
-    Everything that is part of the DOM tree will not trigger any further
-    method calls.
+    record element or above. Two types of methods are called for an element.
+    To receive only the attributes of an element when its start tag is
+    reached implement _attr_TAGNAME. To get the complete element (as an
+    ElementTree Element) once its end tag is reached implement _elem_TAGNAME.
+
+    If lxml is installed and the handle is a file name or a binary mode
+    handle, lxml is used to parse the file and only reports complete entry
+    elements. These are then walked so that the same methods are called in
+    the same order, and any XML syntax error is raised as an ElementTree
+    ParseError, whichever parser is used.
     """
 
     def __init__(self, handle, namespace=None):
@@ -54,44 +82,103 @@ class SeqXmlIterator(object):
         self.speciesName = None
         self.ncbiTaxID = None
         self._namespace = namespace
-        # pulldom.parse can accept both file handles and file names.
-        # However, it doesn't use a context manager. so if we provide a file
-        # name and let pulldom.parse open the file for us, then the file
-        # will remain open until SeqXmlIterator is deallocated or we delete
-        # the DOMEventStream returned by pulldom.parse.
-        # Delete the DOMEventStream in case any exceptions happen.
-        self._events = pulldom.parse(handle)
+        self._tags = {}  # see _split_tag
+        # Map the tag names to the matching _attr_* and _elem_* methods once,
+        # rather than looking them up by name for every element. These are
+        # taken from the class to avoid a reference cycle via bound methods.
+        cls = type(self)
+        self._attr_dispatch = {
+            name[6:]: getattr(cls, name)
+            for name in dir(cls)
+            if name.startswith("_attr_")
+        }
+        self._elem_dispatch = {
+            name[6:]: getattr(cls, name)
+            for name in dir(cls)
+            if name.startswith("_elem_")
+        }
+        # Both iterparse functions can accept file handles and file names.
+        # If we provide a file name, iterparse opens the file for us and only
+        # closes it once all events have been consumed, so the file will
+        # remain open until the iterator is exhausted or deallocated.
+        # Delete the iterator in case any exceptions happen.
+        # Parsing is CPU bound, reading the handle in chunks costs little; a
+        # memory mapped file was measured to be no faster with either parser.
+        self._entries_only = lxml_etree is not None and self._is_binary(handle)
+        if self._entries_only:
+            # Only report the root and the entry elements, we walk
+            # the descendants of each entry ourselves. Unlike ElementTree,
+            # lxml keeps comments and processing instructions in the tree,
+            # which would cut elem.text short, so drop them.
+            entry_tag = "{%s}entry" % (namespace or "")
+            self._events = lxml_etree.iterparse(
+                handle,
+                events=("start", "end"),
+                tag=("{*}seqXML", entry_tag),
+                huge_tree=True,  # allow sequences over 10MB
+                remove_comments=True,
+                remove_pis=True,
+                # Never load external entities (older lxml releases do by
+                # default), or expand any entities in a huge tree. The
+                # entity references are left in place and rejected in
+                # _next_entry, much as expat rejects external entities.
+                resolve_entities=False,
+                no_network=True,
+            )
+        else:
+            self._events = ElementTree.iterparse(handle, events=("start", "end"))
         try:
             try:
-                event, node = next(self._events)
+                event, elem = next(self._events)
             except StopIteration:
-                raise_from(ValueError("Empty file."), None)
-            if event != "START_DOCUMENT" or node.localName is not None:
-                raise ValueError("Failed to find start of XML")
-            self._read_header()
+                raise_from(ValueError("Failed to find seqXML tag in file"), None)
+            except SyntaxError as e:
+                # ElementTree and lxml parse errors both subclass SyntaxError
+                if getattr(e, "position", None) in ((1, 0), (0, 0)):
+                    # Nothing at all to parse
+                    raise_from(ValueError("Empty file."), None)
+                raise _parse_error(e)
+            self._read_header(event, elem)
         except Exception:
             self._events = None
             raise
 
-    def _read_header(self):
+    def _is_binary(self, handle):
+        """Check if lxml can parse the given file name or handle (PRIVATE)."""
+        if not hasattr(handle, "read"):
+            return isinstance(handle, basestring)
+        # lxml will only read from binary mode handles
+        return isinstance(handle.read(0), bytes)
+
+    def _split_tag(self, tag):
+        """Return the namespace and local name of an element tag (PRIVATE).
+
+        The result is cached in self._tags (there are only a few distinct
+        tags), so each tag is only split once.
+        """
+        if tag[0] == "{":
+            namespace, localname = tag[1:].split("}", 1)
+        else:
+            namespace, localname = None, tag
+        self._tags[tag] = (namespace, localname)
+        return namespace, localname
+
+    def _read_header(self, event, elem):
         # Parse the document metadata
-        event, node = next(self._events)
-        if event != "START_ELEMENT" or node.localName != "seqXML":
+        if (
+            event != "start"
+            or self._split_tag(elem.tag)[1] != "seqXML"
+            or (self._entries_only and elem.getparent() is not None)
+        ):
             raise ValueError("Failed to find seqXML tag in file")
-        for index in range(node.attributes.length):
-            item = node.attributes.item(index)
-            name = item.name
-            value = item.value
-            if name == "source":
-                self.source = value
-            elif name == "sourceVersion":
-                self.sourceVersion = value
-            elif name == "seqXMLversion":
-                self.seqXMLversion = value
-            elif name == "ncbiTaxID":
-                self.ncbiTaxID = value
-            elif name == "speciesName":
-                self.speciesName = value
+        self._root = elem
+        # Look up the known attributes directly rather than scanning them all
+        attrib = elem.attrib
+        self.source = attrib.get("source")
+        self.sourceVersion = attrib.get("sourceVersion")
+        self.seqXMLversion = attrib.get("seqXMLversion")
+        self.ncbiTaxID = attrib.get("ncbiTaxID")
+        self.speciesName = attrib.get("speciesName")
 
     def __iter__(self):
         return self
@@ -102,104 +189,139 @@ class SeqXmlIterator(object):
             # No more events; we are at the end of the file
             raise StopIteration
 
-        record = None
         try:
-            for event, node in self._events:
-
-                # the for loop is entered only if there is some content in self._events
-
-                if event == "START_ELEMENT" and node.namespaceURI == self._namespace:
-
-                    if node.localName == "entry":
-                        # create an empty SeqRecord
-                        record = SeqRecord("", id="")
-
-                    # call matching methods with attributes only
-                    if hasattr(self, "_attr_" + node.localName):
-                        getattr(self, "_attr_" + node.localName)(
-                            self._attributes(node), record
-                        )
-
-                    # call matching methods with DOM tree
-                    if hasattr(self, "_elem_" + node.localName):
-                        # read the element and all nested elements into a DOM tree
-                        self._events.expandNode(node)
-                        node.normalize()
-
-                        getattr(self, "_elem_" + node.localName)(node, record)
-
-                elif event == "END_ELEMENT":
-                    if node.namespaceURI == self._namespace:
-                        if node.localName == "entry":
-                            return record
-                        elif node.localName == "seqXML":
-                            # It would be cleaner to continue reading until
-                            # we get to the END_DOCUMENT event.
-                            # However, pulldom seems to have a bug preventing
-                            # this from happening:
-                            # https://bugs.python.org/issue9371
-                            # So we raise a StopIteration here.
-                            # Perhaps we should switch to a SAX parser,
-                            # which seems more robust.
-                            # First, close any temporary file handles:
-                            self._events = None
-                            raise StopIteration
-
-        except SAXParseException as e:
-
-            # Close any temporary file handles
-            self._events.clear()
-
-            if e.getLineNumber() == 1 and e.getColumnNumber() == 0:
-                # empty file
-                pass
+            if self._entries_only:
+                record = self._next_entry()
             else:
-                import os
-
-                if (
-                    e.getLineNumber() == 1
-                    and e.getColumnNumber() == 1
-                    and os.name == "java"
-                ):
-                    # empty file, see http://bugs.jython.org/issue1774
-                    pass
-                else:
-                    raise
-
+                record = self._next_event()
+        except SyntaxError as e:
+            self._events = None
+            raise _parse_error(e)
         except Exception:
-
             # In case of an error, close any temporary file handles
             self._events = None
             raise
 
+        if record is None:
+            # No more events; we are at the end of the file
+            self._events = None
+            raise StopIteration
+        return record
+
+    def _next_event(self):
+        """Build the next record from all the parse events (PRIVATE)."""
+        # Local variables are faster than attribute lookups in the loop
+        tags = self._tags
+        split_tag = self._split_tag
+        expected_namespace = self._namespace
+        attr_dispatch = self._attr_dispatch
+        elem_dispatch = self._elem_dispatch
+        record = None
+        for event, elem in self._events:
+            namespace, localname = tags.get(elem.tag) or split_tag(elem.tag)
+            if namespace != expected_namespace:
+                continue
+
+            if event == "start":
+
+                if localname == "entry":
+                    # create an empty SeqRecord
+                    record = SeqRecord("", id="")
+
+                # call matching methods with attributes only
+                handler = attr_dispatch.get(localname)
+                if handler is not None:
+                    handler(self, elem.attrib, record)
+
+            elif event == "end":
+
+                # call matching methods with the complete element.
+                # The ElementTree parser collects all the character data
+                # of an element into elem.text itself, even when expat
+                # delivers a long sequence in several chunks, so there is
+                # no need to buffer text here.
+                handler = elem_dispatch.get(localname)
+                if handler is not None:
+                    handler(self, elem, record)
+
+                if localname == "entry":
+                    # Free this entry and its children, and drop it from
+                    # the root element, they have all been processed.
+                    elem.clear()
+                    self._root.clear()
+                    return record
+
+    def _next_entry(self):
+        """Build the next record from the lxml entry events (PRIVATE)."""
+        # Local variables are faster than attribute lookups in the loop
+        tags = self._tags
+        split_tag = self._split_tag
+        expected_namespace = self._namespace
+        attr_dispatch = self._attr_dispatch
+        elem_dispatch = self._elem_dispatch
+        iterwalk = lxml_etree.iterwalk
+        entity = lxml_etree.Entity
+        for event, elem in self._events:
+            if event != "end" or elem.getparent() is None:
+                # Start of an entry, or end of the seqXML root
+                continue
+
+            # Walk the complete entry as _next_event handles the parse
+            # events, calling the _attr_* method at the start of each
+            # element and the _elem_* method at its end.
+            record = None
+            for event, child in iterwalk(elem, events=("start", "end")):
+                tag = child.tag
+                if tag is entity:
+                    # see the lxml iterparse call in __init__
+                    raise ElementTree.ParseError(
+                        "undefined entity %s: line %i" % (child.text, child.sourceline)
+                    )
+                namespace, localname = tags.get(tag) or split_tag(tag)
+                if namespace != expected_namespace:
+                    continue
+
+                if event == "start":
+                    if localname == "entry":
+                        record = SeqRecord("", id="")
+                    handler = attr_dispatch.get(localname)
+                    if handler is not None:
+                        handler(self, child.attrib, record)
+                else:
+                    handler = elem_dispatch.get(localname)
+                    if handler is not None:
+                        handler(self, child, record)
+
+            # Free this entry and any earlier siblings,
+            # they have all been processed.
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+            return record
+
     if sys.version_info[0] < 3:  # python2
         def next(self):
             """Python 2 style alias for Python 3 style __next__ method."""
             return self.__next__()
 
-    def _attributes(self, node):
-        """Return the attributes of a DOM node as dictionary (PRIVATE)."""
-        return {
-            node.attributes.item(i).name: node.attributes.item(i).value
-            for i in range(node.attributes.length)
-        }
-
     def _attr_property(self, attr_dict, record):
         """Parse key value pair properties and store them as annotations (PRIVATE)."""
-        if "name" not in attr_dict:
+        name = attr_dict.get("name")
+        if name is None:
             raise ValueError("Malformed property element.")
 
         value = attr_dict.get("value")
 
-        if attr_dict["name"] not in record.annotations:
-            record.annotations[attr_dict["name"]] = value
-        elif isinstance(record.annotations[attr_dict["name"]], list):
-            record.annotations[attr_dict["name"]].append(value)
+        # Look up the name and the annotations dictionary only once
+        annotations = record.annotations
+        if name not in annotations:
+            annotations[name] = value
         else:
-            record.annotations[attr_dict["name"]] = [
-                record.annotations[attr_dict["name"]],
-                value,
-            ]
+            old_value = annotations[name]
+            if isinstance(old_value, list):
+                old_value.append(value)
+            else:
+                annotations[name] = [old_value, value]
 
     def _attr_species(self, attr_dict, record):
         """Parse the species information (PRIVATE)."""
@@ -217,6 +339,8 @@ class SeqXmlIterator(object):
             raise ValueError("Malformed entry! Identifier is missing.")
 
         record.id = attr_dict["id"]
+        # cross references seen in this entry, see _attr_DBRef
+        self._dbxrefs = set()
         if "source" in attr_dict:
             record.annotations["source"] = attr_dict["source"]
         elif self.source is not None:
@@ -229,39 +353,111 @@ class SeqXmlIterator(object):
         if self.speciesName is not None:
             record.annotations["organism"] = self.speciesName
 
-    def _elem_DNAseq(self, node, record):
+    def _elem_DNAseq(self, elem, record):
         """Parse DNA sequence (PRIVATE)."""
-        if not (node.hasChildNodes() and len(node.firstChild.data) > 0):
+        text = elem.text
+        if not text:
             raise ValueError("Sequence length should be greater than 0.")
 
-        record.seq = Seq(node.firstChild.data, Alphabet.generic_dna)
+        # The Seq object just wraps the string from the parser (it is not
+        # copied), so there is little to be saved by creating it lazily.
+        record.seq = Seq(text, Alphabet.generic_dna)
 
-    def _elem_RNAseq(self, node, record):
+    def _elem_RNAseq(self, elem, record):
         """Parse RNA sequence (PRIVATE)."""
-        if not (node.hasChildNodes() and len(node.firstChild.data) > 0):
+        text = elem.text
+        if not text:
             raise ValueError("Sequence length should be greater than 0.")
 
-        record.seq = Seq(node.firstChild.data, Alphabet.generic_rna)
+        record.seq = Seq(text, Alphabet.generic_rna)
 
-    def _elem_AAseq(self, node, record):
+    def _elem_AAseq(self, elem, record):
         """Parse protein sequence (PRIVATE)."""
-        if not (node.hasChildNodes() and len(node.firstChild.data) > 0):
+        text = elem.text
+        if not text:
             raise ValueError("Sequence length should be greater than 0.")
 
-        record.seq = Seq(node.firstChild.data, Alphabet.generic_protein)
+        record.seq = Seq(text, Alphabet.generic_protein)
 
-    def _elem_description(self, node, record):
+    def _elem_description(self, elem, record):
         """Parse the description (PRIVATE)."""
-        if node.hasChildNodes() and len(node.firstChild.data) > 0:
-            record.description = node.firstChild.data
+        text = elem.text
+        if text:
+            record.description = text
 
     def _attr_DBRef(self, attr_dict, record):
         """Parse a database cross reference (PRIVATE)."""
-        if "source" not in attr_dict or "id" not in attr_dict:
+        source = attr_dict.get("source")
+        identifier = attr_dict.get("id")
+        if source is None or identifier is None:
             raise ValueError("Invalid DB cross reference.")
 
-        if "%s:%s" % (attr_dict["source"], attr_dict["id"]) not in record.dbxrefs:
-            record.dbxrefs.append("%s:%s" % (attr_dict["source"], attr_dict["id"]))
+        # Use a set to check for duplicates, rather than a list lookup
+        dbxref = "%s:%s" % (source, identifier)
+        if dbxref not in self._dbxrefs:
+            self._dbxrefs.add(dbxref)
+            record.dbxrefs.append(dbxref)
+
+
+def _parse_error(error):
+    """Return an XML syntax error as an ElementTree ParseError (PRIVATE).
+
+    The lxml errors are converted, so that callers see the same exception
+    for malformed input whichever parser was used.
+    """
+    if isinstance(error, ElementTree.ParseError):
+        return error
+    new_error = ElementTree.ParseError(str(error))
+    new_error.code = getattr(error, "code", None)
+    new_error.position = getattr(error, "position", None)
+    return new_error
+
+
+def SeqXmlHeaderParser(handle, namespace=None):
+    """Iterate over the entries of a SeqXML file as (identifier, source) tuples.
+
+    This is a faster alternative to SeqXmlIterator when only the entry
+    identifiers are needed, for example to count or check the records.
+    No SeqRecord or Seq objects are created, and the sequence and other
+    child elements of each entry are skipped over rather than processed.
+    The source is taken from the entry, or failing that from the seqXML
+    root element, and may be None.
+
+    >>> for identifier, source in SeqXmlHeaderParser("SeqXML/protein_example.xml"):
+    ...     print("%s %s" % (identifier, source))
+    ...
+    ENSMUSP00000099904 Ensembl
+    fake1 Ensembl
+    fake2 Ensembl
+    minimal Ensembl
+    UniprotProtein Uniprot
+
+    """
+    if namespace is None:
+        entry_tag = "entry"
+    else:
+        entry_tag = "{%s}entry" % namespace
+    # Only the start events are needed, as these give the attributes
+    events = ElementTree.iterparse(handle, events=("start",))
+    try:
+        event, root = next(events)
+    except ElementTree.ParseError as e:
+        if e.position == (1, 0):
+            # Nothing at all to parse
+            raise_from(ValueError("Empty file."), None)
+        raise
+    if root.tag.split("}")[-1] != "seqXML":
+        raise ValueError("Failed to find seqXML tag in file")
+    default_source = root.get("source")
+
+    for event, elem in events:
+        if elem.tag == entry_tag:
+            identifier = elem.get("id")
+            if identifier is None:
+                raise ValueError("Malformed entry! Identifier is missing.")
+            # Drop the earlier entries, the parser keeps hold of this one
+            root.clear()
+            yield identifier, elem.get("source", default_source)
 
 
 class SeqXmlWriter(SequentialSequenceWriter):
@@ -280,6 +476,12 @@ class SeqXmlWriter(SequentialSequenceWriter):
 
         self.xml_generator = XMLGenerator(handle, "utf-8")
         self.xml_generator.startDocument()
+        # ignorableWhitespace writes its argument to the output without any
+        # escaping, which we use to write the ready-made XML for each record.
+        self._write_raw = self.xml_generator.ignorableWhitespace
+        # Start of the property element for each annotation key, as most
+        # records share the same keys there is no need to quote them again
+        self._property_prefixes = {}
         self.source = source
         self.source_version = source_version
         self.species = species
@@ -318,7 +520,11 @@ class SeqXmlWriter(SequentialSequenceWriter):
         if not isinstance(record.id, basestring):
             raise TypeError("Identifier should be of type string")
 
-        attrb = {"id": record.id}
+        # Build the entry as a list of strings, and write it with as few
+        # calls as possible rather than many small writes (each of which
+        # would be a system call on an unbuffered binary handle). Only the
+        # sequence is written on its own, see _write_seq.
+        parts = ["<entry id=%s" % quoteattr(record.id)]
 
         if (
             "source" in record.annotations
@@ -326,15 +532,16 @@ class SeqXmlWriter(SequentialSequenceWriter):
         ):
             if not isinstance(record.annotations["source"], basestring):
                 raise TypeError("source should be of type string")
-            attrb["source"] = record.annotations["source"]
+            parts.append(" source=%s" % quoteattr(record.annotations["source"]))
 
-        self.xml_generator.startElement("entry", AttributesImpl(attrb))
-        self._write_species(record)
-        self._write_description(record)
-        self._write_seq(record)
-        self._write_dbxrefs(record)
-        self._write_properties(record)
-        self.xml_generator.endElement("entry")
+        parts.append(">")
+        self._write_species(record, parts)
+        self._write_description(record, parts)
+        self._write_seq(record, parts)
+        self._write_dbxrefs(record, parts)
+        self._write_properties(record, parts)
+        parts.append("</entry>")
+        self._write_raw("".join(parts))
 
     def write_footer(self):
         """Close the root node and finish the XML document."""
@@ -343,8 +550,8 @@ class SeqXmlWriter(SequentialSequenceWriter):
         self.xml_generator.endElement("seqXML")
         self.xml_generator.endDocument()
 
-    def _write_species(self, record):
-        """Write the species if given (PRIVATE)."""
+    def _write_species(self, record, parts):
+        """Add the species if given (PRIVATE)."""
         local_ncbi_taxid = None
         if "ncbi_taxid" in record.annotations:
             local_ncbi_taxid = record.annotations["ncbi_taxid"]
@@ -371,12 +578,13 @@ class SeqXmlWriter(SequentialSequenceWriter):
             # The local species definition is only written if it differs from the global species definition
             if local_org != self.species or local_ncbi_taxid != self.ncbiTaxId:
 
-                attr = {"name": local_org, "ncbiTaxID": local_ncbi_taxid}
-                self.xml_generator.startElement("species", AttributesImpl(attr))
-                self.xml_generator.endElement("species")
+                parts.append(
+                    "<species name=%s ncbiTaxID=%s/>"
+                    % (quoteattr(local_org), quoteattr(str(local_ncbi_taxid)))
+                )
 
-    def _write_description(self, record):
-        """Write the description if given (PRIVATE)."""
+    def _write_description(self, record, parts):
+        """Add the description if given (PRIVATE)."""
         if record.description:
 
             if not isinstance(record.description, basestring):
@@ -387,16 +595,16 @@ class SeqXmlWriter(SequentialSequenceWriter):
                 description = ""
 
             if len(record.description) > 0:
-                self.xml_generator.startElement("description", AttributesImpl({}))
-                self.xml_generator.characters(description)
-                self.xml_generator.endElement("description")
+                parts.append("<description>%s</description>" % escape(description))
 
-    def _write_seq(self, record):
-        """Write the sequence (PRIVATE).
+    def _write_seq(self, record, parts):
+        """Write the entry so far and the sequence (PRIVATE).
 
         Note that SeqXML requires a DNA, RNA or protein alphabet.
         """
-        if isinstance(record.seq, UnknownSeq):
+        # Most records have a plain Seq, so only do the isinstance check
+        # (which is slower than comparing types) for anything else
+        if type(record.seq) is not Seq and isinstance(record.seq, UnknownSeq):
             raise TypeError("Sequence type is UnknownSeq but SeqXML requires sequence")
 
         seq = str(record.seq)
@@ -406,21 +614,29 @@ class SeqXmlWriter(SequentialSequenceWriter):
 
         # Get the base alphabet (underneath any Gapped or StopCodon encoding)
         alpha = Alphabet._get_base_alphabet(record.seq.alphabet)
-        if isinstance(alpha, Alphabet.RNAAlphabet):
-            seqElem = "RNAseq"
-        elif isinstance(alpha, Alphabet.DNAAlphabet):
-            seqElem = "DNAseq"
-        elif isinstance(alpha, Alphabet.ProteinAlphabet):
-            seqElem = "AAseq"
-        else:
-            raise ValueError("Need a DNA, RNA or Protein alphabet")
-
-        self.xml_generator.startElement(seqElem, AttributesImpl({}))
-        self.xml_generator.characters(seq)
-        self.xml_generator.endElement(seqElem)
-
-    def _write_dbxrefs(self, record):
-        """Write all database cross references (PRIVATE)."""
+        # Look up the element name by alphabet class, only doing the
+        # isinstance checks the first time we see a class
+        seqElem = _seq_elements.get(alpha.__class__)
+        if seqElem is None:
+            for alphabet_class, seqElem in _ALPHABET_SEQ_ELEMENTS:
+                if isinstance(alpha, alphabet_class):
+                    break
+            else:
+                raise ValueError("Need a DNA, RNA or Protein alphabet")
+            _seq_elements[alpha.__class__] = seqElem
+
+        # Write the element directly, rather than going through startElement,
+        # characters and endElement. The sequence gets a write of its own, as
+        # adding it to the other parts would make two more copies of what
+        # could be a whole chromosome. The letters must still be escaped as
+        # the Seq object could contain anything.
+        parts.append("<%s>" % seqElem)
+        self._write_raw("".join(parts))
+        self._write_raw(escape(seq))
+        parts[:] = ["</%s>" % seqElem]
+
+    def _write_dbxrefs(self, record, parts):
+        """Add all database cross references (PRIVATE)."""
         if record.dbxrefs is not None:
 
             for dbxref in record.dbxrefs:
@@ -434,34 +650,38 @@ class SeqXmlWriter(SequentialSequenceWriter):
 
                 dbsource, dbid = dbxref.split(":", 1)
 
-                attr = {"source": dbsource, "id": dbid}
-                self.xml_generator.startElement("DBRef", AttributesImpl(attr))
-                self.xml_generator.endElement("DBRef")
+                parts.append(
+                    "<DBRef source=%s id=%s/>" % (quoteattr(dbsource), quoteattr(dbid))
+                )
 
-    def _write_properties(self, record):
-        """Write all annotations that are key value pairs with values of a primitive type or list of primitive types (PRIVATE)."""
+    def _write_properties(self, record, parts):
+        """Add all annotations that are key value pairs with values of a primitive type or list of primitive types (PRIVATE)."""
+        prefixes = self._property_prefixes
         for key, value in record.annotations.items():
 
             if key not in ("organism", "ncbi_taxid", "source"):
 
+                try:
+                    prefix = prefixes[key]
+                except KeyError:
+                    prefix = prefixes[key] = "<property name=%s" % quoteattr(key)
+
                 if value is None:
 
-                    attr = {"name": key}
-                    self.xml_generator.startElement("property", AttributesImpl(attr))
-                    self.xml_generator.endElement("property")
+                    parts.append(prefix + "/>")
 
                 elif isinstance(value, list):
 
                     for v in value:
-                        if isinstance(value, (int, float, basestring)):
-                            attr = {"name": key, "value": v}
-                            self.xml_generator.startElement(
-                                "property", AttributesImpl(attr)
-                            )
-                            self.xml_generator.endElement("property")
-
-                elif isinstance(value, (int, float, basestring)):
-
-                    attr = {"name": key, "value": str(value)}
-                    self.xml_generator.startElement("property", AttributesImpl(attr))
-                    self.xml_generator.endElement("property")
+                        if isinstance(v, _PROPERTY_TYPES):
+                            parts.append("%s value=%s/>" % (prefix, quoteattr(str(v))))
+
+                elif isinstance(value, _PROPERTY_TYPES):
+
+                    parts.append("%s value=%s/>" % (prefix, quoteattr(str(value))))
+
+
+if __name__ == "__main__":
+    from Bio._utils import run_doctest
+
+    run_doctest(verbose=0)
@@ -7,9 +7,13 @@
 import unittest
 import sys
 
+from io import BytesIO
+
 from Bio import SeqIO
+from Bio.Alphabet import generic_dna
 from Bio.Seq import Seq
 from Bio.SeqRecord import SeqRecord
+from Bio.SeqIO.SeqXmlIO import SeqXmlHeaderParser
 from Bio._py3k import StringIO
 
 test_files = {
@@ -31,7 +35,7 @@ def assert_equal_records(testCase, record_a, record_b):
     testCase.assertEqual(record_a.description, record_b.description)
     testCase.assertEqual(str(record_a.seq), str(record_b.seq))
     testCase.assertEqual(record_a.dbxrefs, record_b.dbxrefs)
-    testCase.assertEqual(record_a.annotations, record_a.annotations)
+    testCase.assertEqual(record_a.annotations, record_b.annotations)
 
 
 class TestSimpleRead(unittest.TestCase):
@@ -42,6 +46,63 @@ class TestSimpleRead(unittest.TestCase):
             records = list(SeqIO.parse(test_files[key][0], "seqxml"))
             self.assertEqual(len(records), test_files[key][1])
 
+    def test_binary_and_text_handles(self):
+        """Same records from binary and text mode handles."""
+        for key in test_files:
+            with open(test_files[key][0], "rb") as handle:
+                records1 = list(SeqIO.parse(handle, "seqxml"))
+            with open(test_files[key][0]) as handle:
+                records2 = list(SeqIO.parse(handle, "seqxml"))
+            self.assertEqual(len(records1), len(records2))
+            for record1, record2 in zip(records1, records2):
+                assert_equal_records(self, record1, record2)
+
+    def test_nested_elements_and_comments(self):
+        """Read nested properties and text split by comments."""
+        data = (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<seqXML seqXMLversion="0.4" source="S"><entry id="test">'
+            "<description>some<!--x--> text</description>"
+            "<AAseq>MK<!--x-->L<?pi x?>L</AAseq>"
+            '<DBRef source="db" id="1"><property name="p" value="v"/></DBRef>'
+            "</entry></seqXML>"
+        )
+        for handle in (StringIO(data), BytesIO(data.encode("ascii"))):
+            record = SeqIO.read(handle, "seqxml")
+            self.assertEqual(record.description, "some text")
+            self.assertEqual(str(record.seq), "MKLL")
+            self.assertEqual(record.dbxrefs, ["db:1"])
+            self.assertEqual(record.annotations, {"source": "S", "p": "v"})
+
+    def test_long_sequence(self):
+        """Read a sequence split over several parser input chunks."""
+        sequence = "ACGT" * 50000
+        data = (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<seqXML seqXMLversion="0.4"><entry id="long">'
+            "<DNAseq>%s</DNAseq></entry></seqXML>" % sequence
+        )
+        for handle in (StringIO(data), BytesIO(data.encode("ascii"))):
+            record = SeqIO.read(handle, "seqxml")
+            self.assertEqual(str(record.seq), sequence)
+
+
+class TestHeaderParser(unittest.TestCase):
+
+    def test_identifiers_and_sources(self):
+        """Header parser matches the full parser."""
+        for key in test_files:
+            records = list(SeqIO.parse(test_files[key][0], "seqxml"))
+            headers = list(SeqXmlHeaderParser(test_files[key][0]))
+            self.assertEqual(
+                headers, [(r.id, r.annotations.get("source")) for r in records]
+            )
+
+    def test_for_errors(self):
+        """Header parser handling of corrupt files."""
+        iterator = SeqXmlHeaderParser("SeqXML/corrupt_example2.xml")
+        self.assertRaises(ValueError, next, iterator)
+
 
 class TestDetailedRead(unittest.TestCase):
 
@@ -146,6 +207,16 @@ class TestReadAndWrite(unittest.TestCase):
         for record1, record2 in zip(read1_records, read2_records):
             assert_equal_records(self, record1, record2)
 
+    def test_write_list_property(self):
+        """Write annotations with a list of values as properties."""
+        record = SeqRecord(Seq("ACGT", generic_dna), id="test")
+        record.annotations["test"] = ["a", 2, 3.5]
+        handle = StringIO()
+        SeqIO.write(record, handle, "seqxml")
+        handle.seek(0)
+        record = SeqIO.read(handle, "seqxml")
+        self.assertEqual(record.annotations["test"], ["a", "2", "3.5"])
+
     def test_write_species(self):
         """Test writing species from annotation tags."""
         record = SeqIO.read("SwissProt/sp016", "swiss")
@@ -181,6 +252,26 @@ class TestReadCorruptFiles(unittest.TestCase):
             iterator = SeqIO.parse(filename, "seqxml")
             self.assertRaises(ValueError, next, iterator)
 
+    def test_xml_errors(self):
+        """Same error for malformed XML from text and binary handles."""
+        for data in (
+            # an external entity, which must not be loaded
+            '<?xml version="1.0"?>\n'
+            '<!DOCTYPE seqXML [<!ENTITY x SYSTEM "Fasta/aster.pro">]>\n'
+            '<seqXML seqXMLversion="0.4"><entry id="test">'
+            "<AAseq>MK&x;</AAseq></entry></seqXML>",
+            # a mismatched tag
+            '<seqXML seqXMLversion="0.4"><entry id="test">'
+            "<AAseq>MK</entry></seqXML>",
+        ):
+            errors = []
+            for handle in (StringIO(data), BytesIO(data.encode("ascii"))):
+                iterator = SeqIO.parse(handle, "seqxml")
+                with self.assertRaises(SyntaxError) as cm:
+                    next(iterator)
+                errors.append(type(cm.exception))
+            self.assertEqual(errors[0], errors[1])
+
 
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)